@@ -3,15 +3,16 @@ Force Plate Training Report Generator - Streamlit App
 Easy-to-use web interface for coaches to generate training reports
 """
 
-import streamlit as st
 import pandas as pd
 import numpy as np
 from datetime import datetime
+from dataclasses import dataclass
+from types import MappingProxyType
+import html
 import io
-import base64
+import sys
 from typing import Dict, Tuple
 import warnings
-warnings.filterwarnings('ignore')
 
 try:
     from weasyprint import HTML
@@ -19,15 +20,19 @@ try:
 except ImportError:
     WEASYPRINT_AVAILABLE = False
 
-# ============================================================================
-# PAGE CONFIGURATION
-# ============================================================================
+# Multithreaded CSV parser (ships with Streamlit); default C engine otherwise
+try:
+    import pyarrow  # noqa: F401
+    CSV_ENGINE = 'pyarrow'
+except ImportError:
+    CSV_ENGINE = 'c'
 
-st.set_page_config(
-    page_title="Force Plate Report Generator",
-    layout="wide",
-    initial_sidebar_state="expanded"
-)
+# Rust-based Excel reader for the roster; pandas picks its default otherwise
+try:
+    import python_calamine  # noqa: F401
+    EXCEL_ENGINE = 'calamine'
+except ImportError:
+    EXCEL_ENGINE = None
 
 # ============================================================================
 # CONFIGURATION & DECISION RULES
@@ -39,19 +44,19 @@ DECISION_RULES = {
         'short_name': 'Movement Strategy',
         'display_order': 1,
         'trend_desc': 'Jump strategy and movement efficiency declining',
-        'metrics': ['CMJ_Contraction_Time', 'CMJ_Jump_Height'],
+        'metrics': ('CMJ_Contraction_Time', 'CMJ_Jump_Height'),
         'trend': 'increase',
-        'wr_suggestions': [
+        'wr_suggestions': (
             'Reduce training volume and intensity',
             'Focus on movement quality with lower loads',
             'Implement deload week',
             'Extended rest between sessions'
-        ],
-        'field_suggestions': [
+        ),
+        'field_suggestions': (
             'Reduce practice volume',
             'Focus on skill work over conditioning',
             'Monitor practice intensity'
-        ],
+        ),
         'interpretation': 'Movement strategy changes indicate accumulating fatigue. Reduce training stress and prioritize recovery.',
         'execution_note': 'This is a fatigue indicator. Pull back on volume and intensity. Consider implementing a deload or additional rest day.'
     },
@@ -60,19 +65,19 @@ DECISION_RULES = {
         'short_name': 'Reactive Fatigue',
         'display_order': 2,
         'trend_desc': 'Reactive strength and jump performance declining',
-        'metrics': ['CMJ_RSI_modified', 'CMJ_Jump_Height'],
+        'metrics': ('CMJ_RSI_modified', 'CMJ_Jump_Height'),
         'trend': 'decrease',
-        'wr_suggestions': [
+        'wr_suggestions': (
             'Reduce plyometric volume',
             'Decrease training intensity',
             'Implement active recovery sessions',
             'Focus on sleep and nutrition'
-        ],
-        'field_suggestions': [
+        ),
+        'field_suggestions': (
             'Reduce high-intensity running',
             'Limit change-of-direction drills',
             'Implement active recovery days'
-        ],
+        ),
         'interpretation': 'Systemic fatigue affecting reactive abilities. Reduce training stress and prioritize recovery protocols.',
         'execution_note': 'Red flag for overtraining. Reduce all high-intensity work. Focus on recovery modalities and sleep quality.'
     },
@@ -81,19 +86,19 @@ DECISION_RULES = {
         'short_name': 'Technical',
         'display_order': 3,
         'trend_desc': 'Contraction Time and Time to Peak Force increasing',
-        'metrics': ['CMJ_Contraction_Time', 'IMTP_Time_to_Peak_Force'],
+        'metrics': ('CMJ_Contraction_Time', 'IMTP_Time_to_Peak_Force'),
         'trend': 'increase',
-        'wr_suggestions': [
+        'wr_suggestions': (
             'Wave loading (vary intensity within session)',
             'Cluster sets',
             'Rhythmic tempo work (consistent cadence)',
             'Motor control focus'
-        ],
-        'field_suggestions': [
+        ),
+        'field_suggestions': (
             'Movement skill retraining',
             'Motor control drills',
             'Technical sprint work (not conditioning)'
-        ],
+        ),
         'interpretation': 'Movement efficiency declining. Reduce intensity and focus on movement quality.',
         'execution_note': 'Think movement quality over load. Use wave loading to get quality reps at different intensities.'
     },
@@ -102,20 +107,20 @@ DECISION_RULES = {
         'short_name': 'Asymmetry',
         'display_order': 4,
         'trend_desc': 'L-R Force Asymmetry > 10%',
-        'metrics': ['IMTP_Asymmetry'],
+        'metrics': ('IMTP_Asymmetry',),
         'trend': 'absolute',
         'threshold': 10,
-        'wr_suggestions': [
+        'wr_suggestions': (
             'Single-leg/unilateral strength work',
             'Split-stance patterns (split squats, SL RDLs)',
             'Unilateral jumps and landings',
             'Offset loading'
-        ],
-        'field_suggestions': [
+        ),
+        'field_suggestions': (
             'Unilateral jumps',
             'Single-leg bounds',
             'Asymmetrical agility work'
-        ],
+        ),
         'interpretation': 'Limb imbalances detected. Address through unilateral training to reduce injury risk.',
         'execution_note': 'If squats are programmed, replace with split squats. Address the imbalance through exercise selection.'
     },
@@ -124,18 +129,18 @@ DECISION_RULES = {
         'short_name': 'Eccentric Control',
         'display_order': 5,
         'trend_desc': 'Eccentric braking force declining',
-        'metrics': ['CMJ_Eccentric_Mean_Braking_Force'],
+        'metrics': ('CMJ_Eccentric_Mean_Braking_Force',),
         'trend': 'decrease',
-        'wr_suggestions': [
+        'wr_suggestions': (
             'Tempo eccentrics (5-second down on squats/RDLs)',
             'Accentuated eccentric overload (105-120% 1RM)',
             'Reverse band work (overload eccentric phase)',
             'Example: Safety bar squat with 5-count down'
-        ],
-        'field_suggestions': [
+        ),
+        'field_suggestions': (
             'Change of direction drills',
             'Deceleration-focused agility work'
-        ],
+        ),
         'interpretation': 'Eccentric strength declining - potential injury risk concern. Prioritize eccentric strength development.',
         'execution_note': 'If doing safety bar squats, add a 5-count down. Or use reverse bands. We\'ve done this before.'
     },
@@ -144,17 +149,17 @@ DECISION_RULES = {
         'short_name': 'SSC Efficiency',
         'display_order': 6,
         'trend_desc': 'RSI-modified and Eccentric Braking RFD declining',
-        'metrics': ['CMJ_RSI_modified', 'CMJ_Eccentric_Braking_RFD'],
+        'metrics': ('CMJ_RSI_modified', 'CMJ_Eccentric_Braking_RFD'),
         'trend': 'decrease',
-        'wr_suggestions': [
+        'wr_suggestions': (
             'Reactive/ballistic techniques',
             'Drop jumps, altitude landings',
             'Reactive medicine ball work'
-        ],
-        'field_suggestions': [
+        ),
+        'field_suggestions': (
             'Plyometric training (pogos, bounds, hurdle hops)',
             'Reactive agility drills'
-        ],
+        ),
         'interpretation': 'Stretch-shortening cycle efficiency compromised. Emphasize quick ground contacts and reactive training.',
         'execution_note': 'Emphasize quick ground contacts. Think "hot ground" mentality rather than max height.'
     },
@@ -163,18 +168,18 @@ DECISION_RULES = {
         'short_name': 'Explosive/RFD',
         'display_order': 7,
         'trend_desc': 'Early-phase RFD (50-200ms) declining',
-        'metrics': ['IMTP_Force_50ms', 'IMTP_Force_100ms', 'IMTP_Force_200ms'],
+        'metrics': ('IMTP_Force_50ms', 'IMTP_Force_100ms', 'IMTP_Force_200ms'),
         'trend': 'decrease',
-        'wr_suggestions': [
+        'wr_suggestions': (
             'Contrast/complex training (heavy → explosive superset)',
             'Olympic lift variations (60-70% 1RM)',
             'Accommodating resistance with explosive intent',
             'Example: Trap bar (heavy) → Box jumps (explosive)'
-        ],
-        'field_suggestions': [
+        ),
+        'field_suggestions': (
             'Resisted sprints (10-30% vdec)',
             'Contrast sprints (resisted → unresisted)'
-        ],
+        ),
         'interpretation': 'Rate of force development declining. Consider contrast training emphasis in next phase for these athletes.',
         'execution_note': 'If you planned trap bar deadlifts, pair them with vertical jumps in a superset. Still the same movements, just executed as contrasts.'
     },
@@ -183,18 +188,18 @@ DECISION_RULES = {
         'short_name': 'Power Output',
         'display_order': 8,
         'trend_desc': 'Peak Power declining',
-        'metrics': ['CMJ_Peak_Power'],
+        'metrics': ('CMJ_Peak_Power',),
         'trend': 'decrease',
-        'wr_suggestions': [
+        'wr_suggestions': (
             'Contrast/complex training',
             'Cluster sets (70-80% 1RM)',
             'Olympic lift variations',
             'Ballistic movements emphasis'
-        ],
-        'field_suggestions': [
+        ),
+        'field_suggestions': (
             'Contrast/complex training',
             'Resisted sprints (30-50% vdec)'
-        ],
+        ),
         'interpretation': 'Power output declining. Focus on moving submaximal loads with maximal intent.',
         'execution_note': 'Focus on moving submaximal loads with maximal intent. Use cluster sets for Olympic lifts.'
     },
@@ -203,391 +208,197 @@ DECISION_RULES = {
         'short_name': 'Maximal Strength',
         'display_order': 9,
         'trend_desc': 'IMTP Peak Force and Net Peak Vertical Force declining',
-        'metrics': ['IMTP_Peak_Force', 'IMTP_Net_Peak_Force'],
+        'metrics': ('IMTP_Peak_Force', 'IMTP_Net_Peak_Force'),
         'trend': 'decrease',
-        'wr_suggestions': [
+        'wr_suggestions': (
             'Heavy isometrics with 3-5 second holds',
             'Cluster sets (≥80% 1RM) - 3 reps, 20s rest, repeat 3×',
             'Wave loading (vary intensity within session)',
             'Extend rest periods to 4-5 minutes between sets'
-        ],
-        'field_suggestions': [
+        ),
+        'field_suggestions': (
             'Resisted sprints (50-60% vdec)',
             'Heavy sled pushes',
             'Focus on max force production over speed'
-        ],
+        ),
         'interpretation': 'Maximal strength capacity declining. Consider making cluster sets and extended rest a phase emphasis for these athletes.',
         'execution_note': 'Still do your planned exercises (trap bar, safety bar, whatever), but execute them with longer rest, cluster structure, or add isometric holds.'
     }
 }
 
-SEVERITY_THRESHOLDS = {
+# HTML-escaped copies of the rule text, computed once for the HTML report.
+# Interned so suggestions shared between rules stay a single string object.
+for _rule in DECISION_RULES.values():
+    for _field in ('name', 'short_name', 'interpretation', 'execution_note'):
+        _rule[f'{_field}_html'] = sys.intern(html.escape(_rule[_field]))
+    for _field in ('wr_suggestions', 'field_suggestions'):
+        _rule[f'{_field}_html'] = tuple(sys.intern(html.escape(s)) for s in _rule[_field])
+
+# Rules are static from here on: freeze them (read-only views over tuples) so
+# shared references need no defensive copies
+DECISION_RULES = MappingProxyType({cat_num: MappingProxyType(rule) for cat_num, rule in DECISION_RULES.items()})
+
+# Category numbers sorted by display order (rules are static, so sort once)
+CATEGORY_DISPLAY_ORDER = sorted(DECISION_RULES, key=lambda n: DECISION_RULES[n]['display_order'])
+
+# Rule table in struct-of-arrays form for the vectorized rule evaluator. Rules
+# follow RULE_IDS order; their metrics are flattened into RULE_METRIC_NAMES,
+# with RULE_METRIC_PTR[i]:RULE_METRIC_PTR[i + 1] spanning rule i's metrics.
+# Trend sign is +1 increase, -1 decrease, 0 absolute (current > threshold).
+RULE_IDS = tuple(DECISION_RULES)
+RULE_TREND_SIGN = np.array([{'increase': 1, 'decrease': -1}.get(rule['trend'], 0)
+                            for rule in DECISION_RULES.values()], dtype=np.int8)
+RULE_THRESHOLD = np.array([rule.get('threshold', np.nan) for rule in DECISION_RULES.values()])
+RULE_METRIC_NAMES = tuple(metric for rule in DECISION_RULES.values() for metric in rule['metrics'])
+RULE_METRIC_PTR = np.cumsum([0] + [len(rule['metrics']) for rule in DECISION_RULES.values()])
+
+# Distinct metrics in first-use order; the evaluator's baseline matrices have
+# one column per entry, and RULE_METRIC_COLS maps RULE_METRIC_NAMES onto them
+CANONICAL_METRICS = tuple(dict.fromkeys(RULE_METRIC_NAMES))
+METRIC_INDEX = {metric: col for col, metric in enumerate(CANONICAL_METRICS)}
+RULE_METRIC_COLS = np.array([METRIC_INDEX[metric] for metric in RULE_METRIC_NAMES])
+
+# Rule trend and threshold repeated per (rule, metric) pair
+PAIR_TREND_SIGN = np.repeat(RULE_TREND_SIGN, np.diff(RULE_METRIC_PTR))
+PAIR_THRESHOLD = np.repeat(RULE_THRESHOLD, np.diff(RULE_METRIC_PTR))
+
+# Rule-matrix columns rearranged into category display order
+DISPLAY_RULE_COLS = np.array([RULE_IDS.index(cat_num) for cat_num in CATEGORY_DISPLAY_ORDER])
+
+SEVERITY_THRESHOLDS = MappingProxyType({
     'red': 2.0,
     'orange': 1.5,
     'yellow': 1.0
+})
+
+# Smallest Worthwhile Change as a fraction of the baseline standard deviation
+SWC_FRACTION = 0.2
+
+# Severity codes index this tuple: 0 normal, 1 caution, 2 warning, 3 critical
+SEVERITY_LEVELS = ('normal', 'caution', 'warning', 'critical')
+SEVERITY_CRITICAL = 3
+
+# Ascending SWC multiples bounding codes 1-3 (a deviation above bin i scores
+# at least i + 1)
+SEVERITY_BINS = np.array([SEVERITY_THRESHOLDS['yellow'], SEVERITY_THRESHOLDS['orange'], SEVERITY_THRESHOLDS['red']])
+
+# Flagged-category record for every (rule, nonzero severity code), shared by
+# all athletes flagged that way; the report generators only read them
+FLAG_RECORDS = {
+    (cat_num, code): {
+        'cat_num': cat_num,
+        'name': rule['name'],
+        'short_name': rule['short_name'],
+        'short_name_html': rule['short_name_html'],
+        'severity': SEVERITY_LEVELS[code],
+        'wr_suggestions': rule['wr_suggestions'],
+        'field_suggestions': rule['field_suggestions'],
+        'interpretation': rule['interpretation'],
+        'execution_note': rule['execution_note']
+    }
+    for cat_num, rule in DECISION_RULES.items()
+    for code in range(1, len(SEVERITY_LEVELS))
 }
 
 # Position group mappings
-POSITION_GROUPS = {
-    'Skill': ['WR', 'CB', 'S', 'RB'],
-    'Mid': ['QB', 'TE', 'OLB', 'MLB', 'SPEC'],
-    'Big': ['OL', 'DL']
-}
+POSITION_GROUPS = MappingProxyType({
+    'Skill': ('WR', 'CB', 'S', 'RB'),
+    'Mid': ('QB', 'TE', 'OLB', 'MLB', 'SPEC'),
+    'Big': ('OL', 'DL')
+})
 
-def get_position_group(position):
-    """Map position to position group"""
-    if pd.isna(position) or position == '':
-        return 'Unknown'
+# Reverse lookup: position -> group
+POSITION_TO_GROUP = {position: group for group, positions in POSITION_GROUPS.items() for position in positions}
 
-    position = str(position).upper().strip()
-    for group, positions in POSITION_GROUPS.items():
-        if position in positions:
-            return group
-    return 'Unknown'
+def get_position_groups(positions):
+    """Map a Series of positions to position groups in one vectorized pass"""
+    return positions.astype('string').str.upper().str.strip().map(POSITION_TO_GROUP).fillna('Unknown')
 
 # ============================================================================
-# DATA PROCESSING FUNCTIONS
+# REPORT TEMPLATES
 # ============================================================================
 
-def load_and_validate_files(cmj_file, imtp_file, roster_file):
-    """Load and validate uploaded files"""
-    try:
-        # Load CMJ data
-        cmj = pd.read_csv(cmj_file)
-        cmj['Date'] = pd.to_datetime(cmj['Date'])
-        cmj.columns = cmj.columns.str.strip()
-
-        # Load IMTP data
-        imtp = pd.read_csv(imtp_file)
-        imtp['Date'] = pd.to_datetime(imtp['Date'])
-        imtp.columns = imtp.columns.str.strip()
-
-        # Load roster
-        try:
-            roster = pd.read_excel(roster_file)
-        except:
-            roster = pd.read_csv(roster_file)
-
-        return cmj, imtp, roster, None
-
-    except Exception as e:
-        return None, None, None, str(e)
-
-def process_data(cmj, imtp, roster):
-    """Process and merge data files"""
-
-    # Rename columns
-    cmj_renamed = cmj.rename(columns={
-        'Name': 'Athlete_Name',
-        'Peak Power [W]': 'CMJ_Peak_Power',
-        'RSI-modified [m/s]': 'CMJ_RSI_modified',
-        'Contraction Time [ms]': 'CMJ_Contraction_Time',
-        'Eccentric Mean Braking Force [N]': 'CMJ_Eccentric_Mean_Braking_Force',
-        'Eccentric Braking RFD [N/s]': 'CMJ_Eccentric_Braking_RFD',
-        'Jump Height (Imp-Mom) in Inches [in]': 'CMJ_Jump_Height'
-    })
-
-    imtp_renamed = imtp.rename(columns={
-        'Name': 'Athlete_Name',
-        'Peak Vertical Force [N]': 'IMTP_Peak_Force',
-        'Net Peak Vertical Force [N]': 'IMTP_Net_Peak_Force',
-        'Force at 50ms [N]': 'IMTP_Force_50ms',
-        'Force at 100ms [N]': 'IMTP_Force_100ms',
-        'Force at 200ms [N]': 'IMTP_Force_200ms',
-        'Peak Vertical Force % (Asym) (%)': 'IMTP_Asymmetry_Raw',
-        'Start Time to Peak Force [s]': 'IMTP_Time_to_Peak_Force'
-    })
-
-    # Process IMTP time to milliseconds
-    imtp_renamed['IMTP_Time_to_Peak_Force'] = imtp_renamed['IMTP_Time_to_Peak_Force'] * 1000
-
-    # Process asymmetry
-    def extract_asymmetry(val):
-        if pd.isna(val):
-            return np.nan
-        if isinstance(val, (int, float)):
-            return abs(float(val))
-        val_str = str(val).strip()
-        try:
-            num = float(val_str.split()[0])
-            return abs(num)
-        except:
-            return np.nan
-
-    imtp_renamed['IMTP_Asymmetry'] = imtp_renamed['IMTP_Asymmetry_Raw'].apply(extract_asymmetry)
-
-    # Select columns
-    cmj_cols = ['Athlete_Name', 'Date', 'CMJ_Peak_Power', 'CMJ_RSI_modified',
-                'CMJ_Contraction_Time', 'CMJ_Eccentric_Mean_Braking_Force',
-                'CMJ_Eccentric_Braking_RFD', 'CMJ_Jump_Height']
-
-    imtp_cols = ['Athlete_Name', 'Date', 'IMTP_Peak_Force', 'IMTP_Net_Peak_Force',
-                 'IMTP_Force_50ms', 'IMTP_Force_100ms', 'IMTP_Force_200ms',
-                 'IMTP_Asymmetry', 'IMTP_Time_to_Peak_Force']
-
-    cmj_clean = cmj_renamed[cmj_cols].copy()
-    imtp_clean = imtp_renamed[imtp_cols].copy()
-
-    # Merge
-    merged = pd.merge(cmj_clean, imtp_clean, on=['Athlete_Name', 'Date'], how='outer')
-    merged = pd.merge(merged, roster.rename(columns={'Name': 'Athlete_Name'}),
-                     on='Athlete_Name', how='left')
-
-    merged = merged.sort_values(['Athlete_Name', 'Date']).reset_index(drop=True)
-
-    return merged
-
-def calculate_swc(data):
-    """Calculate Smallest Worthwhile Change"""
-    return 0.2 * np.std(data)
-
-def classify_severity(deviation, swc):
-    """Classify deviation severity"""
-    abs_dev = abs(deviation)
-    if abs_dev > SEVERITY_THRESHOLDS['red'] * swc:
-        return 'critical', '🔴'
-    elif abs_dev > SEVERITY_THRESHOLDS['orange'] * swc:
-        return 'warning', '🟠'
-    elif abs_dev > SEVERITY_THRESHOLDS['yellow'] * swc:
-        return 'caution', '🟡'
-    return 'normal', '🟢'
-
-def categorize_athletes(df):
-    """Categorize athletes based on trends - organized by athlete rather than category"""
-    athlete_results = {}
-    athletes = df['Athlete_Name'].unique()
-
-    # Check each athlete against all categories
-    for athlete in athletes:
-        athlete_data = df[df['Athlete_Name'] == athlete].sort_values('Date')
-
-        if len(athlete_data) < 5:
-            continue
-
-        # Get athlete position info
-        position = athlete_data['Position'].iloc[-1] if 'Position' in athlete_data.columns and pd.notna(athlete_data['Position'].iloc[-1]) else ''
-        position_group = get_position_group(position)
-
-        flagged_categories = []
-
-        # Check each category
-        for cat_num, rule in DECISION_RULES.items():
-            all_flagged = True
-            worst_severity = 'normal'
-            sev_order = {'critical': 0, 'warning': 1, 'caution': 2, 'normal': 3}
-
-            for metric in rule['metrics']:
-                if metric not in df.columns:
-                    all_flagged = False
-                    break
-
-                metric_data = athlete_data[metric].dropna()
-                if len(metric_data) < 3:
-                    all_flagged = False
-                    break
-
-                split = int(len(metric_data) * 0.6)
-                baseline = metric_data.iloc[:split]
-                current = metric_data.iloc[-1]
-
-                if len(baseline) < 2:
-                    all_flagged = False
-                    break
-
-                baseline_mean = baseline.mean()
-                swc = calculate_swc(baseline)
-
-                if rule.get('trend') == 'absolute':
-                    if current > rule['threshold']:
-                        severity, emoji = 'critical', '🔴'
-                    else:
-                        all_flagged = False
-                        break
-                else:
-                    if rule['trend'] == 'decrease':
-                        deviation = baseline_mean - current
-                    else:
-                        deviation = current - baseline_mean
-
-                    severity, emoji = classify_severity(deviation, swc)
-
-                    if severity == 'normal':
-                        all_flagged = False
-                        break
-
-                if sev_order[severity] < sev_order[worst_severity]:
-                    worst_severity = severity
-
-            if all_flagged:
-                flagged_categories.append({
-                    'cat_num': cat_num,
-                    'name': rule['name'],
-                    'short_name': rule['short_name'],
-                    'severity': worst_severity,
-                    'emoji': {'critical': '🔴', 'warning': '🟠', 'caution': '🟡'}[worst_severity],
-                    'wr_suggestions': rule['wr_suggestions'],
-                    'field_suggestions': rule['field_suggestions'],
-                    'interpretation': rule['interpretation'],
-                    'execution_note': rule['execution_note']
-                })
-
-        # Only add athlete if they have flagged categories
-        if flagged_categories:
-            # Sort categories by display order, then by severity
-            flagged_categories.sort(key=lambda x: (DECISION_RULES[x['cat_num']]['display_order'], {'critical': 0, 'warning': 1, 'caution': 2}[x['severity']]))
-
-            athlete_results[athlete] = {
-                'position': position,
-                'position_group': position_group,
-                'flagged_categories': flagged_categories
-            }
-
-    # Group athletes by position group
-    position_group_results = {
-        'Skill': [],
-        'Mid': [],
-        'Big': [],
-        'Unknown': []
-    }
+REPORT_CSS = """\
+        * { margin: 0; padding: 0; box-sizing: border-box; }
+        body { font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif; background-color: #f5f5f5; padding: 20px; color: #333; }
+        .page { max-width: 1400px; margin: 0 auto; background: white; padding: 40px; box-shadow: 0 2px 10px rgba(0,0,0,0.1); }
+        .header { border-bottom: 4px solid #1B5E20; padding-bottom: 20px; margin-bottom: 30px; }
+        .header h1 { color: #1B5E20; font-size: 32px; margin-bottom: 15px; }
+        .header-info { display: grid; grid-template-columns: repeat(2, 1fr); gap: 10px; background: #f8f9fa; padding: 15px; border-radius: 5px; }
+        .header-info strong { color: #1B5E20; display: inline-block; min-width: 150px; margin-right: 10px; }
+        .summary-box { background: #E3F2FD; border-left: 5px solid #1976D2; padding: 20px; margin: 20px 0; border-radius: 5px; }
+        .summary-box h2 { color: #1976D2; font-size: 18px; margin-bottom: 10px; }
+        .summary-box h3 { color: #1976D2; font-size: 16px; margin: 15px 0 10px 0; }
+        .summary-grid { display: grid; grid-template-columns: repeat(3, 1fr); gap: 20px; margin-top: 20px; }
+        .summary-card { background: white; border: 2px solid #1976D2; border-radius: 8px; padding: 15px; }
+        .summary-card h3 { color: #1B5E20; font-size: 16px; margin: 0 0 10px 0; border-bottom: 2px solid #1B5E20; padding-bottom: 5px; }
+        .summary-stat { padding: 5px 0; font-size: 14px; overflow: hidden; }
+        .summary-stat strong { color: #333; float: right; }
+        .category-breakdown { margin-top: 10px; padding-top: 10px; border-top: 1px solid #ddd; font-size: 13px; }
+        .category-breakdown-item { padding: 3px 0; }
 
-    for athlete, data in athlete_results.items():
-        position_group_results[data['position_group']].append({
-            'name': athlete,
-            'position': data['position'],
-            'flagged_categories': data['flagged_categories']
-        })
+        /* Position group styling */
+        .position-group { border: 2px solid #e0e0e0; border-radius: 8px; margin: 25px 0; overflow: hidden; page-break-inside: auto; }
+        .position-header { background: linear-gradient(135deg, #1B5E20 0%, #2E7D32 100%); color: white; padding: 15px 20px; }
+        .position-header h3 { font-size: 20px; margin: 0; }
+        .position-summary { background: #E3F2FD; border-left: 5px solid #1976D2; padding: 15px 20px; margin: 0; }
+        .position-summary-stats { display: grid; grid-template-columns: repeat(2, 1fr); gap: 15px; margin-bottom: 10px; }
+        .position-summary-stat { padding: 5px 0; font-size: 14px; overflow: hidden; }
+        .position-summary-stat strong { color: #333; float: right; }
+        .position-summary-categories { margin-top: 10px; padding-top: 10px; border-top: 1px solid rgba(255,255,255,0.3); }
+        .position-summary-categories strong { display: block; margin-bottom: 5px; font-size: 13px; }
+        .position-summary-cat-item { font-size: 12px; padding: 2px 0; }
+        .position-body { padding: 20px; }
 
-    # Sort athletes within each group by name
-    for group in position_group_results:
-        position_group_results[group].sort(key=lambda x: x['name'])
+        /* Athlete row styling */
+        .athlete-row { display: grid; grid-template-columns: 200px 1fr; gap: 15px; padding: 12px 0; border-bottom: 1px solid #e0e0e0; align-items: start; page-break-inside: avoid; }
+        .athlete-row:last-child { border-bottom: none; }
+        .athlete-name { font-weight: 600; font-size: 15px; color: #1B5E20; }
+        .athlete-position { font-size: 13px; color: #666; margin-top: 2px; }
 
-    return {
-        'athletes': athlete_results,
-        'position_groups': position_group_results
-    }
+        /* Category badges */
+        .category-badges { margin-bottom: -6px; }
+        .category-badge { display: inline-block; margin: 0 2px 6px 0; padding: 5px 10px; border-radius: 3px; font-size: 12px; white-space: nowrap; }
+        .category-badge.critical { background: #FFEBEE; border-left: 3px solid #C62828; color: #C62828; font-weight: 500; }
+        .category-badge.warning { background: #FFF3E0; border-left: 3px solid #EF6C00; color: #EF6C00; font-weight: 500; }
+        .category-badge.caution { background: #FFFDE7; border-left: 3px solid #F57F17; color: #F57F17; font-weight: 500; }
+        .category-name { font-weight: 500; }
 
-def generate_html_report(results, df, team_name, training_phase, next_phase):
-    """Generate HTML report grouped by position"""
+        /* Legend */
+        .legend { background: #f8f9fa; padding: 15px; border-radius: 5px; margin: 20px 0; }
+        .legend h4 { font-size: 14px; margin-bottom: 10px; color: #1B5E20; }
+        .legend-grid { display: grid; grid-template-columns: repeat(auto-fit, minmax(300px, 1fr)); gap: 8px; font-size: 13px; }
+        .legend-item { padding: 5px 0; }
+        .legend-num { font-weight: 600; color: #1B5E20; display: inline-block; min-width: 20px; }
 
-    total_athletes = df['Athlete_Name'].nunique()
-    total_flagged = len(results['athletes'])
-    data_window = f"{df['Date'].min().date()} to {df['Date'].max().date()}"
-    report_date = datetime.now()
-
-    # Count unique categories flagged and athletes per category
-    category_counts = {}
-    for athlete_data in results['athletes'].values():
-        for cat in athlete_data['flagged_categories']:
-            cat_num = cat['cat_num']
-            if cat_num not in category_counts:
-                category_counts[cat_num] = 0
-            category_counts[cat_num] += 1
-    categories_flagged = len(category_counts)
-
-    # Calculate stats per position group
-    position_group_stats = {}
-    for group_name in ['Skill', 'Mid', 'Big']:
-        # Total athletes in this position group in the dataset
-        group_positions = POSITION_GROUPS[group_name]
-        total_in_group = df[df['Position'].isin(group_positions)]['Athlete_Name'].nunique()
-
-        # Flagged athletes in this position group
-        flagged_in_group = len(results['position_groups'][group_name])
-
-        # Category breakdown for this position group
-        group_category_counts = {}
-        for athlete in results['position_groups'][group_name]:
-            for cat in athlete['flagged_categories']:
-                cat_num = cat['cat_num']
-                if cat_num not in group_category_counts:
-                    group_category_counts[cat_num] = 0
-                group_category_counts[cat_num] += 1
-
-        position_group_stats[group_name] = {
-            'total': total_in_group,
-            'flagged': flagged_in_group,
-            'category_counts': group_category_counts
-        }
+        /* Training recommendations section */
+        .recommendations-section { margin: 40px 0; }
+        .recommendations-title { color: #1B5E20; font-size: 24px; margin-bottom: 20px; padding-bottom: 10px; border-bottom: 3px solid #1B5E20; }
+        .category-recommendations { border: 2px solid #e0e0e0; border-radius: 8px; margin: 20px 0; overflow: hidden; page-break-inside: avoid; }
+        .category-rec-header { background: linear-gradient(135deg, #1565C0 0%, #1976D2 100%); color: white; padding: 12px 20px; }
+        .category-rec-header h4 { font-size: 16px; margin: 0; }
+        .category-rec-body { padding: 20px; }
+        .rec-columns { display: grid; grid-template-columns: repeat(2, 1fr); gap: 20px; }
+        .rec-column h5 { color: #1B5E20; font-size: 14px; margin-bottom: 10px; }
+        .rec-column ul { list-style: none; padding-left: 0; margin: 0; }
+        .rec-column li { padding: 6px 0 6px 20px; position: relative; line-height: 1.4; font-size: 13px; }
+        .rec-column li:before { content: "→"; position: absolute; left: 0; color: #1B5E20; font-weight: bold; }
+        .rec-note { background: #E8F5E9; padding: 12px; border-left: 3px solid #4CAF50; margin-top: 15px; border-radius: 3px; font-size: 13px; }
+        .rec-note strong { color: #1B5E20; }
+
+        .footer { margin-top: 40px; padding-top: 20px; border-top: 2px solid #e0e0e0; text-align: center; color: #666; font-size: 14px; }
+        @media print { .page { box-shadow: none; } }
+"""
 
-    html = f"""<!DOCTYPE html>
+# Document head, header block and legend opener; {css} takes REPORT_CSS
+REPORT_HEADER_TEMPLATE = """<!DOCTYPE html>
 <html lang="en">
 <head>
     <meta charset="UTF-8">
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
     <title>Force Plate Training Report - {team_name}</title>
     <style>
-        * {{ margin: 0; padding: 0; box-sizing: border-box; }}
-        body {{ font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif; background-color: #f5f5f5; padding: 20px; color: #333; }}
-        .page {{ max-width: 1400px; margin: 0 auto; background: white; padding: 40px; box-shadow: 0 2px 10px rgba(0,0,0,0.1); }}
-        .header {{ border-bottom: 4px solid #1B5E20; padding-bottom: 20px; margin-bottom: 30px; }}
-        .header h1 {{ color: #1B5E20; font-size: 32px; margin-bottom: 15px; }}
-        .header-info {{ display: grid; grid-template-columns: repeat(2, 1fr); gap: 10px; background: #f8f9fa; padding: 15px; border-radius: 5px; }}
-        .header-info div {{ display: flex; gap: 10px; }}
-        .header-info strong {{ color: #1B5E20; min-width: 150px; }}
-        .summary-box {{ background: #E3F2FD; border-left: 5px solid #1976D2; padding: 20px; margin: 20px 0; border-radius: 5px; }}
-        .summary-box h2 {{ color: #1976D2; font-size: 18px; margin-bottom: 10px; }}
-        .summary-box h3 {{ color: #1976D2; font-size: 16px; margin: 15px 0 10px 0; }}
-        .summary-grid {{ display: grid; grid-template-columns: repeat(3, 1fr); gap: 20px; margin-top: 20px; }}
-        .summary-card {{ background: white; border: 2px solid #1976D2; border-radius: 8px; padding: 15px; }}
-        .summary-card h3 {{ color: #1B5E20; font-size: 16px; margin: 0 0 10px 0; border-bottom: 2px solid #1B5E20; padding-bottom: 5px; }}
-        .summary-stat {{ display: flex; justify-content: space-between; padding: 5px 0; font-size: 14px; }}
-        .summary-stat strong {{ color: #333; }}
-        .category-breakdown {{ margin-top: 10px; padding-top: 10px; border-top: 1px solid #ddd; font-size: 13px; }}
-        .category-breakdown-item {{ padding: 3px 0; }}
-
-        /* Position group styling */
-        .position-group {{ border: 2px solid #e0e0e0; border-radius: 8px; margin: 25px 0; overflow: hidden; page-break-inside: avoid; }}
-        .position-header {{ background: linear-gradient(135deg, #1B5E20 0%, #2E7D32 100%); color: white; padding: 15px 20px; }}
-        .position-header h3 {{ font-size: 20px; margin: 0; }}
-        .position-summary {{ background: #E3F2FD; border-left: 5px solid #1976D2; padding: 15px 20px; margin: 0; }}
-        .position-summary-stats {{ display: grid; grid-template-columns: repeat(2, 1fr); gap: 15px; margin-bottom: 10px; }}
-        .position-summary-stat {{ display: flex; justify-content: space-between; padding: 5px 0; font-size: 14px; }}
-        .position-summary-stat strong {{ color: #333; }}
-        .position-summary-categories {{ margin-top: 10px; padding-top: 10px; border-top: 1px solid rgba(255,255,255,0.3); }}
-        .position-summary-categories strong {{ display: block; margin-bottom: 5px; font-size: 13px; }}
-        .position-summary-cat-item {{ font-size: 12px; padding: 2px 0; }}
-        .position-body {{ padding: 20px; }}
-
-        /* Athlete row styling */
-        .athlete-row {{ display: grid; grid-template-columns: 200px 1fr; gap: 15px; padding: 12px 0; border-bottom: 1px solid #e0e0e0; align-items: start; }}
-        .athlete-row:last-child {{ border-bottom: none; }}
-        .athlete-info {{ display: flex; flex-direction: column; }}
-        .athlete-name {{ font-weight: 600; font-size: 15px; color: #1B5E20; }}
-        .athlete-position {{ font-size: 13px; color: #666; margin-top: 2px; }}
-
-        /* Category badges */
-        .category-badges {{ display: flex; flex-wrap: wrap; gap: 6px; align-items: center; }}
-        .category-badge {{ display: inline-flex; align-items: center; padding: 5px 10px; border-radius: 3px; font-size: 12px; white-space: nowrap; }}
-        .category-badge.critical {{ background: #FFEBEE; border-left: 3px solid #C62828; color: #C62828; font-weight: 500; }}
-        .category-badge.warning {{ background: #FFF3E0; border-left: 3px solid #EF6C00; color: #EF6C00; font-weight: 500; }}
-        .category-badge.caution {{ background: #FFFDE7; border-left: 3px solid #F57F17; color: #F57F17; font-weight: 500; }}
-        .category-name {{ font-weight: 500; }}
-
-        /* Legend */
-        .legend {{ background: #f8f9fa; padding: 15px; border-radius: 5px; margin: 20px 0; }}
-        .legend h4 {{ font-size: 14px; margin-bottom: 10px; color: #1B5E20; }}
-        .legend-grid {{ display: grid; grid-template-columns: repeat(auto-fit, minmax(300px, 1fr)); gap: 8px; font-size: 13px; }}
-        .legend-item {{ padding: 5px 0; }}
-        .legend-num {{ font-weight: 600; color: #1B5E20; display: inline-block; min-width: 20px; }}
-
-        /* Training recommendations section */
-        .recommendations-section {{ margin: 40px 0; }}
-        .recommendations-title {{ color: #1B5E20; font-size: 24px; margin-bottom: 20px; padding-bottom: 10px; border-bottom: 3px solid #1B5E20; }}
-        .category-recommendations {{ border: 2px solid #e0e0e0; border-radius: 8px; margin: 20px 0; overflow: hidden; page-break-inside: avoid; }}
-        .category-rec-header {{ background: linear-gradient(135deg, #1565C0 0%, #1976D2 100%); color: white; padding: 12px 20px; }}
-        .category-rec-header h4 {{ font-size: 16px; margin: 0; }}
-        .category-rec-body {{ padding: 20px; }}
-        .rec-columns {{ display: grid; grid-template-columns: repeat(2, 1fr); gap: 20px; }}
-        .rec-column h5 {{ color: #1B5E20; font-size: 14px; margin-bottom: 10px; }}
-        .rec-column ul {{ list-style: none; padding-left: 0; margin: 0; }}
-        .rec-column li {{ padding: 6px 0 6px 20px; position: relative; line-height: 1.4; font-size: 13px; }}
-        .rec-column li:before {{ content: "→"; position: absolute; left: 0; color: #1B5E20; font-weight: bold; }}
-        .rec-note {{ background: #E8F5E9; padding: 12px; border-left: 3px solid #4CAF50; margin-top: 15px; border-radius: 3px; font-size: 13px; }}
-        .rec-note strong {{ color: #1B5E20; }}
-
-        .footer {{ margin-top: 40px; padding-top: 20px; border-top: 2px solid #e0e0e0; text-align: center; color: #666; font-size: 14px; }}
-        @media print {{ .page {{ box-shadow: none; }} }}
-    </style>
+{css}    </style>
 </head>
 <body>
     <div class="page">
@@ -595,7 +406,7 @@ def generate_html_report(results, df, team_name, training_phase, next_phase):
             <h1>FORCE PLATE TRAINING REPORT</h1>
             <div class="header-info">
                 <div><strong>Team:</strong> <span>{team_name}</span></div>
-                <div><strong>Report Date:</strong> <span>{report_date.strftime('%B %d, %Y')}</span></div>
+                <div><strong>Report Date:</strong> <span>{report_date}</span></div>
                 <div><strong>Training Phase:</strong> <span>{training_phase}</span></div>
                 <div><strong>Data Window:</strong> <span>{data_window}</span></div>
                 <div><strong>Next Phase:</strong> <span>{next_phase}</span></div>
@@ -608,69 +419,481 @@ def generate_html_report(results, df, team_name, training_phase, next_phase):
             <div class="legend-grid">
 """
 
-    # Add category legend sorted by display order
-    for cat_num, rule in sorted(DECISION_RULES.items(), key=lambda x: x[1]['display_order']):
-        html += f'                <div class="legend-item"><span class="legend-num">{cat_num}.</span> {rule["name"]}</div>\n'
+# Position group header and summary stats (category list and body follow)
+POSITION_GROUP_HEADER_TEMPLATE = """
+        <div class="position-group">
+            <div class="position-header">
+                <h3>{group_name} POSITIONS ({position_list})</h3>
+            </div>
+            <div class="position-summary">
+                <div class="position-summary-stats">
+                    <div class="position-summary-stat">
+                        <span>Total Athletes:</span>
+                        <strong>{total}</strong>
+                    </div>
+                    <div class="position-summary-stat">
+                        <span>Athletes Flagged:</span>
+                        <strong>{flagged} ({pct:.0f}%)</strong>
+                    </div>
+                </div>
+"""
+
+# One "Cat N (name): count" line in a position group summary
+POSITION_SUMMARY_CAT_TEMPLATE = """\
+                    <div class="position-summary-cat-item">• Cat {cat_num} ({short_name}): {count} athletes</div>
+"""
 
-    html += """            </div>
+# Footer and document close
+REPORT_FOOTER_TEMPLATE = """
+        <div class="footer">
+            <p><strong>Report generated:</strong> {report_generated}</p>
+            <p><strong>Next report:</strong> End of {next_phase}</p>
+            <p style="margin-top: 10px;">Baylor University Athletics - Applied Performance</p>
         </div>
+    </div>
+</body>
+</html>
 """
 
-    # Add training recommendations section (moved before athlete lists)
-    html += """
-        <div class="recommendations-section">
-            <h2 class="recommendations-title">TRAINING RECOMMENDATIONS BY CATEGORY</h2>
+# Flagged athlete row; {badges} is the joined CATEGORY_BADGE_TEMPLATE output
+ATHLETE_ROW_TEMPLATE = """\
+                <div class="athlete-row">
+                    <div class="athlete-info">
+                        <div class="athlete-name">{name}</div>
+                        <div class="athlete-position">{position}</div>
+                    </div>
+                    <div class="category-badges">
+{badges}                    </div>
+                </div>
 """
 
-    # Sort by display order
-    sorted_categories = sorted(category_counts.keys(), key=lambda x: DECISION_RULES[x]['display_order'])
-    for cat_num in sorted_categories:
-        rule = DECISION_RULES[cat_num]
-        count = category_counts[cat_num]
+# Category badge, filled straight from a flagged-category dict via format_map
+CATEGORY_BADGE_TEMPLATE = """\
+                        <div class="category-badge {severity}">
+                            <span class="category-name">{short_name_html}</span>
+                        </div>
+"""
 
-        html += f"""
+# Training recommendations card for one flagged category (filled via str.format)
+CATEGORY_REC_TEMPLATE = """
             <div class="category-recommendations">
                 <div class="category-rec-header">
-                    <h4>CATEGORY {cat_num}: {rule['name'].upper()} ({count} athletes flagged)</h4>
+                    <h4>CATEGORY {cat_num}: {name} ({count} athletes flagged)</h4>
                 </div>
                 <div class="category-rec-body">
                     <div class="rec-columns">
                         <div class="rec-column">
                             <h5>WEIGHT ROOM RECOMMENDATIONS:</h5>
                             <ul>
-"""
-
-        for suggestion in rule['wr_suggestions']:
-            html += f"                                <li>{suggestion}</li>\n"
-
-        html += """                            </ul>
+{wr_items}                            </ul>
                         </div>
                         <div class="rec-column">
                             <h5>FIELD RECOMMENDATIONS:</h5>
                             <ul>
-"""
-
-        for suggestion in rule['field_suggestions']:
-            html += f"                                <li>{suggestion}</li>\n"
-
-        html += f"""                            </ul>
+{field_items}                            </ul>
                         </div>
                     </div>
                     <div class="rec-note">
-                        <strong>Interpretation:</strong> {rule['interpretation']}
+                        <strong>Interpretation:</strong> {interpretation}
                     </div>
                     <div class="rec-note" style="background: #E3F2FD; border-left-color: #2196F3;">
-                        <strong>Execution Note:</strong> {rule['execution_note']}
+                        <strong>Execution Note:</strong> {execution_note}
                     </div>
                 </div>
             </div>
 """
 
-    html += """        </div>
+# CATEGORY_REC_TEMPLATE pre-rendered per rule and split around {count}, the
+# only per-report field: a card is str(count).join(CATEGORY_REC_CARDS[cat_num])
+CATEGORY_REC_CARDS = {
+    cat_num: tuple(CATEGORY_REC_TEMPLATE.format(
+        cat_num=cat_num,
+        name=html.escape(rule['name'].upper()),
+        count='\0',
+        wr_items="".join([f"                                <li>{s}</li>\n" for s in rule['wr_suggestions_html']]),
+        field_items="".join([f"                                <li>{s}</li>\n" for s in rule['field_suggestions_html']]),
+        interpretation=rule['interpretation_html'],
+        execution_note=rule['execution_note_html']
+    ).split('\0'))
+    for cat_num, rule in DECISION_RULES.items()
+}
 
-        <h2 style="color: #1B5E20; font-size: 24px; margin: 40px 0 20px 0; padding-bottom: 10px; border-bottom: 3px solid #1B5E20;">FLAGGED ATHLETES BY POSITION</h2>
+# Legend items through the recommendations opener; identical for every report
+REPORT_LEGEND_HTML = "".join([
+    f'                <div class="legend-item"><span class="legend-num">{cat_num}.</span> {DECISION_RULES[cat_num]["name_html"]}</div>\n'
+    for cat_num in CATEGORY_DISPLAY_ORDER
+]) + """            </div>
+        </div>
+
+        <div class="recommendations-section">
+            <h2 class="recommendations-title">TRAINING RECOMMENDATIONS BY CATEGORY</h2>
 """
 
+# ============================================================================
+# DATA PROCESSING FUNCTIONS
+# ============================================================================
+
+# ForceDecks export columns used by the report, mapped to internal names
+CMJ_COLUMNS = {
+    'Name': 'Athlete_Name',
+    'Date': 'Date',
+    'Peak Power [W]': 'CMJ_Peak_Power',
+    'RSI-modified [m/s]': 'CMJ_RSI_modified',
+    'Contraction Time [ms]': 'CMJ_Contraction_Time',
+    'Eccentric Mean Braking Force [N]': 'CMJ_Eccentric_Mean_Braking_Force',
+    'Eccentric Braking RFD [N/s]': 'CMJ_Eccentric_Braking_RFD',
+    'Jump Height (Imp-Mom) in Inches [in]': 'CMJ_Jump_Height'
+}
+
+IMTP_COLUMNS = {
+    'Name': 'Athlete_Name',
+    'Date': 'Date',
+    'Peak Vertical Force [N]': 'IMTP_Peak_Force',
+    'Net Peak Vertical Force [N]': 'IMTP_Net_Peak_Force',
+    'Force at 50ms [N]': 'IMTP_Force_50ms',
+    'Force at 100ms [N]': 'IMTP_Force_100ms',
+    'Force at 200ms [N]': 'IMTP_Force_200ms',
+    'Peak Vertical Force % (Asym) (%)': 'IMTP_Asymmetry_Raw',
+    'Start Time to Peak Force [s]': 'IMTP_Time_to_Peak_Force'
+}
+
+# Roster columns joined onto the test data
+ROSTER_COLUMNS = ('Name', 'Position')
+
+def is_roster_column(col):
+    """usecols filter for the roster; missing roster columns are simply absent"""
+    return col in ROSTER_COLUMNS
+
+# ForceDecks export date format (e.g. 11/20/2025)
+FORCEDECKS_DATE_FORMAT = '%m/%d/%Y'
+
+def parse_test_dates(dates):
+    """Parse export dates with the known format, inferring it only if that fails"""
+    try:
+        return pd.to_datetime(dates, format=FORCEDECKS_DATE_FORMAT, cache=True)
+    except (ValueError, TypeError):
+        return pd.to_datetime(dates, cache=True)
+
+def rewind(file):
+    """Return a file object to its start for another read; paths reopen on their own"""
+    if hasattr(file, 'seek'):
+        file.seek(0)
+
+def read_export_csv(file, columns):
+    """Read only the given export columns; header names are matched after stripping"""
+    header = pd.read_csv(file, nrows=0).columns
+    rewind(file)
+    usecols = [col for col in header if col.strip() in columns]
+    data = pd.read_csv(file, engine=CSV_ENGINE, usecols=usecols)
+    data.columns = data.columns.str.strip()
+    return data
+
+def load_and_validate_files(cmj_file, imtp_file, roster_file):
+    """Load and validate uploaded files"""
+    try:
+        # Load CMJ data
+        cmj = read_export_csv(cmj_file, CMJ_COLUMNS)
+        cmj['Date'] = parse_test_dates(cmj['Date'])
+
+        # Load IMTP data
+        imtp = read_export_csv(imtp_file, IMTP_COLUMNS)
+        imtp['Date'] = parse_test_dates(imtp['Date'])
+
+        # Load roster (only the columns the report joins on)
+        try:
+            roster = pd.read_excel(roster_file, engine=EXCEL_ENGINE, usecols=is_roster_column)
+        except Exception:
+            # Not a workbook: the failed Excel read may have left the
+            # upload at EOF, so rewind before parsing it as CSV
+            rewind(roster_file)
+            roster = pd.read_csv(roster_file, usecols=is_roster_column)
+
+        return cmj, imtp, roster, None
+
+    except Exception as e:
+        return None, None, None, str(e)
+
+def process_data(cmj, imtp, roster):
+    """Process and merge data files"""
+
+    # Rename columns
+    cmj_renamed = cmj.rename(columns=CMJ_COLUMNS)
+    imtp_renamed = imtp.rename(columns=IMTP_COLUMNS)
+
+    # Process IMTP time to milliseconds
+    imtp_renamed['IMTP_Time_to_Peak_Force'] = imtp_renamed['IMTP_Time_to_Peak_Force'] * 1000
+
+    # Process asymmetry: magnitude from values like "1.3 L"; unparseable -> NaN.
+    # The raw text column is popped so it is released as soon as it's parsed
+    asymmetry_raw = imtp_renamed.pop('IMTP_Asymmetry_Raw')
+    if not pd.api.types.is_numeric_dtype(asymmetry_raw):
+        asymmetry_raw = asymmetry_raw.astype('string').str.split(n=1).str[0]
+    imtp_renamed['IMTP_Asymmetry'] = pd.to_numeric(asymmetry_raw, errors='coerce').abs()
+
+    # Select columns
+    cmj_cols = ['Athlete_Name', 'Date', 'CMJ_Peak_Power', 'CMJ_RSI_modified',
+                'CMJ_Contraction_Time', 'CMJ_Eccentric_Mean_Braking_Force',
+                'CMJ_Eccentric_Braking_RFD', 'CMJ_Jump_Height']
+
+    imtp_cols = ['Athlete_Name', 'Date', 'IMTP_Peak_Force', 'IMTP_Net_Peak_Force',
+                 'IMTP_Force_50ms', 'IMTP_Force_100ms', 'IMTP_Force_200ms',
+                 'IMTP_Asymmetry', 'IMTP_Time_to_Peak_Force']
+
+    cmj_clean = cmj_renamed[cmj_cols].set_index(['Athlete_Name', 'Date']).sort_index()
+    imtp_clean = imtp_renamed[imtp_cols].set_index(['Athlete_Name', 'Date']).sort_index()
+
+    # Merge on the sorted (athlete, date) index; the outer join keeps it sorted
+    merged = cmj_clean.join(imtp_clean, how='outer').reset_index()
+    merged = merged.join(roster.set_index('Name'), on='Athlete_Name', rsuffix='_roster')
+
+    # Repeated labels as categoricals: groupbys and isin work on integer codes
+    for col in ('Athlete_Name', 'Position'):
+        if col in merged.columns:
+            merged[col] = merged[col].astype('category')
+
+    return merged
+
+def classify_severity(deviation, swc):
+    """Classify deviation severity as a code into SEVERITY_LEVELS
+
+    The code is the number of SEVERITY_BINS the deviation exceeds, computed
+    in one broadcast comparison, element-wise over arrays of any shape.
+    """
+    abs_dev = np.abs(np.asarray(deviation, dtype=float))[..., np.newaxis]
+    return (abs_dev > np.asarray(swc, dtype=float)[..., np.newaxis] * SEVERITY_BINS).sum(axis=-1, dtype=np.int8)
+
+def compute_metric_baselines(values, athlete_ids):
+    """Current value, baseline mean and SWC per athlete for one metric column
+
+    Each athlete's non-null values (in date order) are split 60/40: the first
+    60% form the baseline the latest value is compared against. Only athletes
+    with at least 3 values and 2 baseline tests are returned, as parallel
+    arrays (athlete_ids, current, baseline_mean, swc). Expects values and
+    integer athlete ids from a frame sorted by athlete and date.
+    """
+    has_value = ~np.isnan(values)
+    values = values[has_value]
+    athlete_ids = athlete_ids[has_value]
+    empty = (np.empty(0, dtype=np.intp), np.empty(0), np.empty(0), np.empty(0))
+    if len(values) == 0:
+        return empty
+
+    # Athletes occupy contiguous runs of the sorted values
+    starts = np.flatnonzero(np.r_[True, athlete_ids[1:] != athlete_ids[:-1]])
+    counts = np.diff(np.r_[starts, len(values)])
+    splits = (counts * 0.6).astype(int)
+    valid = (counts >= 3) & (splits >= 2)
+
+    # Pack the baseline runs of valid athletes back to back for reduceat
+    rank = np.arange(len(values)) - np.repeat(starts, counts)
+    in_baseline = (rank < np.repeat(splits, counts)) & np.repeat(valid, counts)
+    starts, counts, splits = starts[valid], counts[valid], splits[valid]
+    if len(starts) == 0:
+        return empty
+    baseline = values[in_baseline]
+    baseline_starts = np.r_[0, np.cumsum(splits)[:-1]]
+
+    # Two-pass mean/std over every baseline in one reduceat each; SWC is
+    # SWC_FRACTION times the population (ddof=0) SD of each baseline
+    baseline_mean = np.add.reduceat(baseline, baseline_starts) / splits
+    centered = baseline - np.repeat(baseline_mean, splits)
+    swc = SWC_FRACTION * np.sqrt(np.add.reduceat(centered * centered, baseline_starts) / splits)
+
+    return athlete_ids[starts], values[starts + counts - 1], baseline_mean, swc
+
+def compute_rule_severities(df, athlete_ids, n_athletes):
+    """Worst severity code for every athlete and decision rule
+
+    A rule flags an athlete only when all of its metrics are flagged; the
+    rule's severity is the worst of them. athlete_ids numbers each row's
+    athlete (0..n_athletes-1) in a frame sorted by athlete and date. Returns
+    an int8 (athlete x rule) matrix in RULE_IDS order, 0 where not flagged.
+    """
+    # Athlete x metric baseline matrices, each metric computed once. NaN marks
+    # a missing column or too few tests, and classifies as normal below
+    current, baseline_mean, swc = (np.full((n_athletes, len(CANONICAL_METRICS)), np.nan) for _ in range(3))
+    for col, metric in enumerate(CANONICAL_METRICS):
+        if metric not in df.columns:
+            continue
+        rows, metric_current, metric_mean, metric_swc = compute_metric_baselines(
+            df[metric].to_numpy(dtype=float), athlete_ids)
+        current[rows, col] = metric_current
+        baseline_mean[rows, col] = metric_mean
+        swc[rows, col] = metric_swc
+
+    # Severity for every (rule, metric) pair across all athletes at once
+    pair_current = current[:, RULE_METRIC_COLS]
+    codes = np.where(
+        PAIR_TREND_SIGN == 0,
+        np.where(pair_current > PAIR_THRESHOLD, SEVERITY_CRITICAL, 0),
+        classify_severity(PAIR_TREND_SIGN * (pair_current - baseline_mean[:, RULE_METRIC_COLS]),
+                          swc[:, RULE_METRIC_COLS])
+    ).astype(np.int8)
+
+    # Reduce each rule's span of pair columns: flagged only if every metric is
+    rule_starts = RULE_METRIC_PTR[:-1]
+    return np.where(np.minimum.reduceat(codes, rule_starts, axis=1) > 0,
+                    np.maximum.reduceat(codes, rule_starts, axis=1), 0).astype(np.int8)
+
+@dataclass(slots=True)
+class FlaggedAthlete:
+    """Athlete with at least one flagged category"""
+    name: str
+    position: str
+    position_group: str
+    flagged_categories: list
+
+@dataclass(slots=True)
+class CategorySection:
+    """Flagged category as rendered by both report formats"""
+    cat_num: int
+    count: int
+
+    @property
+    def rule(self):
+        return DECISION_RULES[self.cat_num]
+
+def compute_position_group_stats(df, flags):
+    """Athlete total, flagged count and per-category flag counts per position group"""
+    if 'Position' in df.columns:
+        group_totals = df.groupby(df['Position'].map(POSITION_TO_GROUP), observed=True)['Athlete_Name'].nunique()
+    else:
+        group_totals = pd.Series(dtype=int)
+    group_flagged = flags.groupby('position_group')['name'].nunique()
+    group_category_counts = flags.groupby(['position_group', 'cat_num']).size()
+
+    return {
+        group_name: {
+            'total': group_totals.get(group_name, 0),
+            'flagged': group_flagged.get(group_name, 0),
+            'category_counts': group_category_counts.get(group_name, pd.Series(dtype=int)).to_dict()
+        }
+        for group_name in ('Skill', 'Mid', 'Big')
+    }
+
+def categorize_athletes(df):
+    """Categorize athletes based on trends - organized by athlete rather than category"""
+    athlete_results = {}
+    all_tests = df
+    total_athletes = df['Athlete_Name'].nunique()
+    date_min, date_max = df['Date'].agg(['min', 'max'])
+
+    # Only athletes with at least 5 tests are evaluated; drop the rest up front
+    test_counts = df.groupby('Athlete_Name', sort=False, observed=True)['Date'].transform('size')
+    df = df[test_counts.to_numpy() >= 5].sort_values(['Athlete_Name', 'Date'], kind='stable')
+
+    # Integer athlete ids in order of appearance, which in the sorted frame
+    # numbers the contiguous athlete runs; names are only looked up for output
+    athlete_ids, athletes = pd.factorize(df['Athlete_Name'])
+    athletes = np.asarray(athletes, dtype=object)
+    is_last = np.ones(len(athlete_ids), dtype=bool)
+    is_last[:-1] = athlete_ids[1:] != athlete_ids[:-1]
+    last_rows = np.flatnonzero(is_last)
+
+    # Latest position (blank when missing) and its group per athlete
+    if 'Position' in df.columns:
+        latest_positions = df['Position'].iloc[last_rows]
+        positions = latest_positions.astype(object).fillna('').to_numpy()
+        position_groups = get_position_groups(latest_positions).to_numpy()
+    else:
+        positions = np.full(len(athletes), '', dtype=object)
+        position_groups = np.full(len(athletes), 'Unknown', dtype=object)
+
+    # Severity of every athlete x category in display order; nonzero cells
+    # are the flags, ordered by athlete then display order
+    codes = compute_rule_severities(df, athlete_ids, len(athletes))[:, DISPLAY_RULE_COLS]
+    flag_athletes, flag_cats = np.nonzero(codes)
+    flag_codes = codes[flag_athletes, flag_cats]
+    flag_cat_nums = np.asarray(CATEGORY_DISPLAY_ORDER)[flag_cats]
+
+    for a, cat_num, code in zip(flag_athletes.tolist(), flag_cat_nums.tolist(), flag_codes.tolist()):
+        athlete = athletes[a]
+        if athlete not in athlete_results:
+            athlete_results[athlete] = FlaggedAthlete(athlete, positions[a], position_groups[a], [])
+
+        athlete_results[athlete].flagged_categories.append(FLAG_RECORDS[cat_num, code])
+
+    # Group athletes by position group
+    position_group_results = {
+        'Skill': [],
+        'Mid': [],
+        'Big': [],
+        'Unknown': []
+    }
+
+    # Athletes were created in athlete id order, which follows the frame's
+    # name sort, so each group's list comes out sorted by name
+    for athlete in athlete_results.values():
+        position_group_results[athlete.position_group].append(athlete)
+
+    # One row per (athlete, flagged category) for vectorized counting
+    flags = pd.DataFrame({
+        'name': athletes[flag_athletes],
+        'position_group': position_groups[flag_athletes],
+        'cat_num': flag_cat_nums
+    })
+    # Flagged category numbers in display order (membership via the counts index)
+    category_counts = flags['cat_num'].value_counts()
+    sorted_cat_nums = [n for n in CATEGORY_DISPLAY_ORDER if n in category_counts.index]
+
+    return {
+        'athletes': athlete_results,
+        'position_groups': position_group_results,
+        'flags': flags,
+        'sorted_cat_nums': sorted_cat_nums,
+        # Shared per-category view consumed by both report generators
+        'category_sections': [CategorySection(n, int(category_counts[n])) for n in sorted_cat_nums],
+        # Shared per-position-group summary, computed once for both reports
+        'position_group_stats': compute_position_group_stats(all_tests, flags),
+        'total_athletes': total_athletes,
+        'data_window': f"{date_min.date()} to {date_max.date()}",
+        'total_flagged': len(athlete_results)
+    }
+
+def generate_html_report(results, team_name, training_phase, next_phase, report_date=None, out=None):
+    """Generate HTML report grouped by position
+
+    Chunks are written to `out` (any file-like object with write()) as they
+    are rendered. When `out` is None the report is built in an in-memory
+    buffer and returned as a string.
+    """
+
+    # User-entered header fields are escaped once and reused everywhere
+    team_name = html.escape(team_name)
+    training_phase = html.escape(training_phase)
+    next_phase = html.escape(next_phase)
+
+    total_athletes = results['total_athletes']
+    data_window = results['data_window']
+    report_date = report_date or datetime.now()
+    report_date_str = report_date.strftime('%B %d, %Y')
+    report_generated_str = report_date.strftime('%B %d, %Y at %I:%M %p')
+
+    buffer = io.StringIO() if out is None else out
+    write = buffer.write
+
+    write(REPORT_HEADER_TEMPLATE.format(
+        css=REPORT_CSS,
+        team_name=team_name,
+        report_date=report_date_str,
+        training_phase=training_phase,
+        data_window=data_window,
+        next_phase=next_phase,
+        total_athletes=total_athletes
+    ))
+
+    # Category legend and training recommendations (before athlete lists)
+    write(REPORT_LEGEND_HTML)
+    write("".join([
+        str(section.count).join(CATEGORY_REC_CARDS[section.cat_num])
+        for section in results['category_sections']
+    ]))
+
+    write("""        </div>
+
+        <h2 style="color: #1B5E20; font-size: 24px; margin: 40px 0 20px 0; padding-bottom: 10px; border-bottom: 3px solid #1B5E20;">FLAGGED ATHLETES BY POSITION</h2>
+""")
+
     # Add position groups (moved after recommendations)
     for group_name in ['Skill', 'Mid', 'Big']:
         group_athletes = results['position_groups'][group_name]
@@ -680,165 +903,103 @@ def generate_html_report(results, df, team_name, training_phase, next_phase):
 
         # Get position list for this group
         position_list = ', '.join(POSITION_GROUPS[group_name])
-        stats = position_group_stats[group_name]
+        stats = results['position_group_stats'][group_name]
         pct = (stats['flagged'] / stats['total'] * 100) if stats['total'] > 0 else 0
 
-        html += f"""
-        <div class="position-group">
-            <div class="position-header">
-                <h3>{group_name.upper()} POSITIONS ({position_list})</h3>
-            </div>
-            <div class="position-summary">
-                <div class="position-summary-stats">
-                    <div class="position-summary-stat">
-                        <span>Total Athletes:</span>
-                        <strong>{stats['total']}</strong>
-                    </div>
-                    <div class="position-summary-stat">
-                        <span>Athletes Flagged:</span>
-                        <strong>{stats['flagged']} ({pct:.0f}%)</strong>
-                    </div>
-                </div>
-"""
+        write(POSITION_GROUP_HEADER_TEMPLATE.format(
+            group_name=group_name.upper(),
+            position_list=position_list,
+            total=stats['total'],
+            flagged=stats['flagged'],
+            pct=pct
+        ))
 
         if stats['category_counts']:
-            html += """                <div class="position-summary-categories">
+            write("""                <div class="position-summary-categories">
                     <strong>Categories Flagged in this Group:</strong>
-"""
-            # Sort by display order
-            for cat_num in sorted(stats['category_counts'].keys(), key=lambda x: DECISION_RULES[x]['display_order']):
+""")
+            for cat_num in results['sorted_cat_nums']:
+                if cat_num not in stats['category_counts']:
+                    continue
                 count = stats['category_counts'][cat_num]
-                cat_name = DECISION_RULES[cat_num]['short_name']
-                html += f"""                    <div class="position-summary-cat-item">• Cat {cat_num} ({cat_name}): {count} athletes</div>
-"""
-            html += """                </div>
-"""
+                write(POSITION_SUMMARY_CAT_TEMPLATE.format(
+                    cat_num=cat_num, short_name=DECISION_RULES[cat_num]['short_name_html'], count=count))
+            write("""                </div>
+""")
 
-        html += """            </div>
+        write("""            </div>
             <div class="position-body">
-"""
+""")
 
-        for athlete in group_athletes:
-            html += f"""                <div class="athlete-row">
-                    <div class="athlete-info">
-                        <div class="athlete-name">{athlete['name']}</div>
-                        <div class="athlete-position">{athlete['position']}</div>
-                    </div>
-                    <div class="category-badges">
-"""
-
-            for cat in athlete['flagged_categories']:
-                html += f"""                        <div class="category-badge {cat['severity']}">
-                            <span class="category-name">{cat['short_name']}</span>
-                        </div>
-"""
+        write("".join([
+            ATHLETE_ROW_TEMPLATE.format(
+                name=html.escape(athlete.name),
+                position=html.escape(str(athlete.position)),
+                badges="".join([CATEGORY_BADGE_TEMPLATE.format_map(cat) for cat in athlete.flagged_categories]))
+            for athlete in group_athletes
+        ]))
 
-            html += """                    </div>
-                </div>
-"""
-
-        html += """            </div>
+        write("""            </div>
         </div>
-"""
+""")
 
-    html += f"""
-        <div class="footer">
-            <p><strong>Report generated:</strong> {report_date.strftime('%B %d, %Y at %I:%M %p')}</p>
-            <p><strong>Next report:</strong> End of {next_phase}</p>
-            <p style="margin-top: 10px;">Baylor University Athletics - Applied Performance</p>
-        </div>
-    </div>
-</body>
-</html>
-"""
+    write(REPORT_FOOTER_TEMPLATE.format(report_generated=report_generated_str, next_phase=next_phase))
 
-    return html
+    if out is None:
+        return buffer.getvalue()
 
-def generate_text_report(results, df, team_name, training_phase):
+def generate_text_report(results, team_name, training_phase, report_date=None):
     """Generate text report grouped by position"""
 
-    total_athletes = df['Athlete_Name'].nunique()
-    total_flagged = len(results['athletes'])
-
-    # Count unique categories and athletes per category
-    category_counts = {}
-    for athlete_data in results['athletes'].values():
-        for cat in athlete_data['flagged_categories']:
-            cat_num = cat['cat_num']
-            if cat_num not in category_counts:
-                category_counts[cat_num] = 0
-            category_counts[cat_num] += 1
-    categories_flagged = len(category_counts)
-
-    # Calculate stats per position group
-    position_group_stats = {}
-    for group_name in ['Skill', 'Mid', 'Big']:
-        group_positions = POSITION_GROUPS[group_name]
-        total_in_group = df[df['Position'].isin(group_positions)]['Athlete_Name'].nunique()
-        flagged_in_group = len(results['position_groups'][group_name])
-
-        group_category_counts = {}
-        for athlete in results['position_groups'][group_name]:
-            for cat in athlete['flagged_categories']:
-                cat_num = cat['cat_num']
-                if cat_num not in group_category_counts:
-                    group_category_counts[cat_num] = 0
-                group_category_counts[cat_num] += 1
-
-        position_group_stats[group_name] = {
-            'total': total_in_group,
-            'flagged': flagged_in_group,
-            'category_counts': group_category_counts
-        }
-
-    report = []
-    report.append("="*80)
-    report.append("FORCE PLATE TRAINING REPORT".center(80))
-    report.append("="*80)
-    report.append(f"\nTeam: {team_name}")
-    report.append(f"Report Date: {datetime.now().strftime('%B %d, %Y')}")
-    report.append(f"Training Phase: {training_phase}")
-    report.append(f"Data Window: {df['Date'].min().date()} to {df['Date'].max().date()}")
-    report.append("-"*80)
-
-    report.append("\n" + "="*80)
-    report.append("DEVELOPMENTAL CATEGORY LEGEND".center(80))
-    report.append("="*80)
+    report_date = report_date or datetime.now()
+    rule_line = "-"*80 + "\n"
+    banner_line = "="*80 + "\n"
+
+    buffer = io.StringIO()
+    write = buffer.write
+    writelines = buffer.writelines
+
+    write(banner_line)
+    write("FORCE PLATE TRAINING REPORT".center(80) + "\n")
+    write(banner_line)
+    write(f"\nTeam: {team_name}\n")
+    write(f"Report Date: {report_date.strftime('%B %d, %Y')}\n")
+    write(f"Training Phase: {training_phase}\n")
+    write(f"Data Window: {results['data_window']}\n")
+    write(rule_line)
+
+    write("\n" + banner_line)
+    write("DEVELOPMENTAL CATEGORY LEGEND".center(80) + "\n")
+    write(banner_line)
     # Sort by display order
-    for cat_num, rule in sorted(DECISION_RULES.items(), key=lambda x: x[1]['display_order']):
-        report.append(f"  {cat_num}. {rule['name']}")
-    report.append("")
+    writelines([f"  {cat_num}. {DECISION_RULES[cat_num]['name']}\n" for cat_num in CATEGORY_DISPLAY_ORDER])
+    write("\n")
 
     # Add training recommendations (before athlete lists)
-    report.append("\n" + "="*80)
-    report.append("TRAINING RECOMMENDATIONS BY CATEGORY".center(80))
-    report.append("="*80)
+    write("\n" + banner_line)
+    write("TRAINING RECOMMENDATIONS BY CATEGORY".center(80) + "\n")
+    write(banner_line)
 
-    # Sort by display order
-    sorted_categories = sorted(category_counts.keys(), key=lambda x: DECISION_RULES[x]['display_order'])
-    for cat_num in sorted_categories:
-        rule = DECISION_RULES[cat_num]
-        count = category_counts[cat_num]
+    for section in results['category_sections']:
+        rule = section.rule
 
-        report.append(f"\nCATEGORY {cat_num}: {rule['name'].upper()} ({count} athletes flagged)")
-        report.append("-"*80)
+        write(f"\nCATEGORY {section.cat_num}: {rule['name'].upper()} ({section.count} athletes flagged)\n")
+        write(rule_line)
 
-        report.append("\nWEIGHT ROOM RECOMMENDATIONS:")
-        for suggestion in rule['wr_suggestions']:
-            report.append(f"  → {suggestion}")
+        write("\nWEIGHT ROOM RECOMMENDATIONS:\n")
+        writelines([f"  → {s}\n" for s in rule['wr_suggestions']])
 
-        report.append("\nFIELD RECOMMENDATIONS:")
-        for suggestion in rule['field_suggestions']:
-            report.append(f"  → {suggestion}")
+        write("\nFIELD RECOMMENDATIONS:\n")
+        writelines([f"  → {s}\n" for s in rule['field_suggestions']])
 
-        report.append(f"\nINTERPRETATION: {rule['interpretation']}")
-        report.append(f"\nEXECUTION NOTE: {rule['execution_note']}")
-        report.append("")
+        write(f"\nINTERPRETATION: {rule['interpretation']}\n")
+        write(f"\nEXECUTION NOTE: {rule['execution_note']}\n")
+        write("\n")
 
     # Add flagged athletes section (after recommendations)
-    report.append("\n" + "="*80)
-    report.append("FLAGGED ATHLETES BY POSITION".center(80))
-    report.append("="*80)
+    write("\n" + banner_line)
+    write("FLAGGED ATHLETES BY POSITION".center(80) + "\n")
+    write(banner_line)
 
     for group_name in ['Skill', 'Mid', 'Big']:
         group_athletes = results['position_groups'][group_name]
@@ -847,72 +1008,80 @@ def generate_text_report(results, df, team_name, training_phase):
             continue
 
         position_list = ', '.join(POSITION_GROUPS[group_name])
-        stats = position_group_stats[group_name]
+        stats = results['position_group_stats'][group_name]
         pct = (stats['flagged'] / stats['total'] * 100) if stats['total'] > 0 else 0
 
-        report.append(f"\n{group_name.upper()} POSITIONS ({position_list})")
-        report.append("-"*80)
+        write(f"\n{group_name.upper()} POSITIONS ({position_list})\n")
+        write(rule_line)
 
         # Position-specific executive summary
-        report.append(f"\nEXECUTIVE SUMMARY:")
-        report.append(f"  Total Athletes: {stats['total']}")
-        report.append(f"  Athletes Flagged: {stats['flagged']} ({pct:.0f}%)")
+        write("\nEXECUTIVE SUMMARY:\n")
+        write(f"  Total Athletes: {stats['total']}\n")
+        write(f"  Athletes Flagged: {stats['flagged']} ({pct:.0f}%)\n")
 
         if stats['category_counts']:
-            report.append(f"\n  Categories Flagged in this Group:")
-            # Sort by display order
-            for cat_num in sorted(stats['category_counts'].keys(), key=lambda x: DECISION_RULES[x]['display_order']):
+            write("\n  Categories Flagged in this Group:\n")
+            for cat_num in results['sorted_cat_nums']:
+                if cat_num not in stats['category_counts']:
+                    continue
                 count = stats['category_counts'][cat_num]
                 cat_name = DECISION_RULES[cat_num]['short_name']
-                report.append(f"    • Cat {cat_num} ({cat_name}): {count} athletes")
+                write(f"    • Cat {cat_num} ({cat_name}): {count} athletes\n")
 
-        report.append(f"\nFLAGGED ATHLETES:")
+        write("\nFLAGGED ATHLETES:\n")
         for athlete in group_athletes:
-            report.append(f"\n  {athlete['name']} ({athlete['position']})")
+            write(f"\n  {athlete.name} ({athlete.position})\n")
 
             # List flagged categories (abbreviated)
-            cat_strs = []
-            for cat in athlete['flagged_categories']:
-                cat_strs.append(f"  • {cat['short_name']} ({cat['severity'].title()})")
+            writelines([f"      • {cat['short_name']} ({cat['severity'].title()})\n"
+                        for cat in athlete.flagged_categories])
 
-            for cat_str in cat_strs:
-                report.append(f"    {cat_str}")
+        write("\n")
 
-        report.append("")
+    write("\n" + banner_line)
+    write("END OF REPORT".center(80) + "\n")
+    write("="*80)
 
-    report.append("\n" + "="*80)
-    report.append("END OF REPORT".center(80))
-    report.append("="*80)
-
-    return "\n".join(report)
+    return buffer.getvalue()
 
 def generate_pdf_report(html_content):
     """Convert HTML report to PDF using WeasyPrint"""
     if not WEASYPRINT_AVAILABLE:
-        return None
+        return None, None
 
     try:
         # Create PDF in memory
         pdf_bytes = HTML(string=html_content).write_pdf()
-        return pdf_bytes
+        return pdf_bytes, None
     except Exception as e:
-        st.error(f"PDF generation error: {str(e)}")
-        return None
-
-def create_download_link(content, filename, file_type):
-    """Create download link for file"""
-    if file_type == 'html':
-        b64 = base64.b64encode(content.encode()).decode()
-        return f'<a href="data:text/html;base64,{b64}" download="{filename}">Download {filename}</a>'
-    elif file_type == 'text':
-        b64 = base64.b64encode(content.encode()).decode()
-        return f'<a href="data:text/plain;base64,{b64}" download="{filename}">Download {filename}</a>'
+        return None, str(e)
 
 # ============================================================================
 # STREAMLIT APP
 # ============================================================================
 
 def main():
+    # Streamlit is imported here so the report functions above can be
+    # imported without pulling in the web framework
+    import streamlit as st
+
+    # Page configuration (must be the first Streamlit call)
+    st.set_page_config(
+        page_title="Force Plate Report Generator",
+        layout="wide",
+        initial_sidebar_state="expanded"
+    )
+    warnings.filterwarnings('ignore')
+
+    # Memoize the pandas pipeline across reruns. Uploads are passed as bytes
+    # so the cache key is the file contents rather than the upload widget
+    @st.cache_data(show_spinner=False)
+    def load_uploads(cmj_bytes, imtp_bytes, roster_bytes):
+        return load_and_validate_files(io.BytesIO(cmj_bytes), io.BytesIO(imtp_bytes), io.BytesIO(roster_bytes))
+
+    cached_process_data = st.cache_data(show_spinner=False)(process_data)
+    cached_categorize_athletes = st.cache_data(show_spinner=False)(categorize_athletes)
+
     # Header
     st.title("Force Plate Training Report Generator")
     st.markdown("**Baylor University Athletics - Applied Performance**")
@@ -944,13 +1113,20 @@ def main():
         with col_end:
             end_date = st.date_input("End Date", value=pd.Timestamp.now())
 
+    # WeasyPrint rendering is slow, so the PDF is only built when asked for
+    include_pdf = WEASYPRINT_AVAILABLE and st.sidebar.checkbox(
+        "Include PDF",
+        value=False,
+        help="Also render a PDF copy of the report (slower)"
+    )
+
     st.sidebar.markdown("---")
     st.sidebar.header("Instructions")
     st.sidebar.markdown("""
     1. Upload your three data files
     2. Select date window for analysis
     3. Click "Generate Report"
-    4. Download HTML, Text, or PDF
+    4. Download HTML, Text, or PDF (tick "Include PDF" first)
     """)
 
     # Main content
@@ -996,7 +1172,7 @@ def main():
             st.error("Please upload all three files before generating the report.")
         else:
             with st.spinner("Loading and validating data files..."):
-                cmj, imtp, roster, error = load_and_validate_files(cmj_file, imtp_file, roster_file)
+                cmj, imtp, roster, error = load_uploads(cmj_file.getvalue(), imtp_file.getvalue(), roster_file.getvalue())
 
                 if error:
                     st.error(f"Error loading files: {error}")
@@ -1007,41 +1183,38 @@ def main():
                 st.success(f"Loaded Roster: {len(roster)} athletes")
 
             with st.spinner("Processing and merging data..."):
-                merged_df = process_data(cmj, imtp, roster)
+                merged_df = cached_process_data(cmj, imtp, roster)
                 st.success(f"Merged dataset: {len(merged_df)} tests from {merged_df['Athlete_Name'].nunique()} athletes")
 
             # Apply date filtering based on user selection
             with st.spinner("Applying date filter..."):
+                # filtered_df is only read, so no defensive copies are taken
                 if date_window_option == "All Data":
-                    filtered_df = merged_df.copy()
+                    filtered_df = merged_df
                 elif date_window_option == "Custom Date Range":
-                    filtered_df = merged_df[
-                        (merged_df['Date'] >= pd.to_datetime(start_date)) &
-                        (merged_df['Date'] <= pd.to_datetime(end_date))
-                    ].copy()
+                    filtered_df = merged_df.loc[merged_df['Date'].between(pd.Timestamp(start_date), pd.Timestamp(end_date))]
                 else:
                     # Extract months from option (e.g., "Last 3 Months" -> 3)
                     months = int(date_window_option.split()[1])
                     cutoff_date = pd.Timestamp.now() - pd.DateOffset(months=months)
-                    filtered_df = merged_df[merged_df['Date'] >= cutoff_date].copy()
+                    filtered_df = merged_df.loc[merged_df['Date'] >= cutoff_date]
 
                 st.success(f"Date filter applied: {len(filtered_df)} tests from {filtered_df['Athlete_Name'].nunique()} athletes in selected window")
 
             with st.spinner("Categorizing athletes and analyzing trends..."):
-                results = categorize_athletes(filtered_df)
-                total_flagged = len(results['athletes'])
+                results = cached_categorize_athletes(filtered_df)
+                total_flagged = results['total_flagged']
 
                 # Count unique categories flagged
-                all_categories = set()
-                for athlete_data in results['athletes'].values():
-                    for cat in athlete_data['flagged_categories']:
-                        all_categories.add(cat['cat_num'])
+                categories_flagged = results['flags']['cat_num'].nunique()
 
-                st.success(f"Found {len(all_categories)} categories with {total_flagged} athletes flagged")
+                st.success(f"Found {categories_flagged} categories with {total_flagged} athletes flagged")
 
             with st.spinner("Generating reports..."):
-                html_report = generate_html_report(results, filtered_df, team_name, training_phase, next_phase)
-                text_report = generate_text_report(results, filtered_df, team_name, training_phase)
+                # Stamp both reports and the download filenames with the same time
+                report_date = datetime.now()
+                file_stamp = report_date.strftime('%Y%m%d')
+                html_report = generate_html_report(results, team_name, training_phase, next_phase, report_date)
 
             st.success("Reports generated successfully!")
 
@@ -1061,33 +1234,39 @@ def main():
             with col1:
                 st.download_button(
                     label="Download HTML",
-                    data=html_report,
-                    file_name=f"Training_Report_{datetime.now().strftime('%Y%m%d')}.html",
+                    data=html_report.encode('utf-8'),
+                    file_name=f"Training_Report_{file_stamp}.html",
                     mime="text/html"
                 )
 
             with col2:
                 st.download_button(
                     label="Download Text",
-                    data=text_report,
-                    file_name=f"Training_Report_{datetime.now().strftime('%Y%m%d')}.txt",
+                    # Built on click; the preview only needs the HTML report
+                    data=lambda: generate_text_report(results, team_name, training_phase, report_date).encode('utf-8'),
+                    file_name=f"Training_Report_{file_stamp}.txt",
                     mime="text/plain"
                 )
 
             with col3:
-                if WEASYPRINT_AVAILABLE:
+                if include_pdf:
                     with st.spinner("Generating PDF..."):
-                        pdf_data = generate_pdf_report(html_report)
+                        pdf_data, pdf_error = generate_pdf_report(html_report)
+
+                    if pdf_error:
+                        st.error(f"PDF generation error: {pdf_error}")
 
                     if pdf_data:
                         st.download_button(
                             label="Download PDF",
                             data=pdf_data,
-                            file_name=f"Training_Report_{datetime.now().strftime('%Y%m%d')}.pdf",
+                            file_name=f"Training_Report_{file_stamp}.pdf",
                             mime="application/pdf"
                         )
                     else:
                         st.error("PDF generation failed. Use browser's Print to PDF feature from the HTML report.")
+                elif WEASYPRINT_AVAILABLE:
+                    st.info("Tick \"Include PDF\" in the sidebar to render a PDF, or use browser's Print to PDF feature from the HTML report.")
                 else:
                     st.info("PDF library not available. Use browser's Print to PDF feature from the HTML report.")
 